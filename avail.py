@@ -1,12 +1,23 @@
 #!/usr/bin/env python3
 
 
+import hashlib
+import json
+import os
+import re
 import shlex
-from sys import exit
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache, partial
+from itertools import dropwhile, islice, takewhile
+from sys import exit, stdout
 
 try:
     import requests
-    from bs4 import BeautifulSoup
+    from requests.adapters import HTTPAdapter
+    from bs4 import BeautifulSoup, SoupStrainer
+    from selectolax.lexbor import LexborHTMLParser
 except ModuleNotFoundError as e:
     print(e)
     print('Install dependencies for this script by running')
@@ -14,20 +25,101 @@ except ModuleNotFoundError as e:
     exit(1)
 
 
-LINUX_MAN_PAGES = 'https://www.man7.org/linux/man-pages/man1/{}.1.html'
-FREEBSD_MAN_PAGES = ('https://bsd-unix.com/man.cgi?query={}&sektion=1'
-                     '&manpath=FreeBSD+9.3-stable&format=html')
+# The URL of each OS's man page for a command is built with an f-string,
+# which is faster than formatting a template string on every lookup
+
+
+def linux_man_page_url(command_name):
+    return f'https://www.man7.org/linux/man-pages/man1/{command_name}.1.html'
+
+
+def freebsd_man_page_url(command_name):
+    return (f'https://bsd-unix.com/man.cgi?query={command_name}&sektion=1'
+            '&manpath=FreeBSD+9.3-stable&format=html')
+
+
 # Man pages for Solaris user commands
-SOLARIS_USER_MAN_PAGES = 'https://docs.oracle.com/cd/E23824_01/html/821-1461/{}-1.html'
+def solaris_user_man_page_url(command_name):
+    return f'https://docs.oracle.com/cd/E23824_01/html/821-1461/{command_name}-1.html'
+
+
 # Man pages for Solaris admin commands
-SOLARIS_ADMIN_MAN_PAGES = 'https://docs.oracle.com/cd/E23824_01/html/821-1462/{}-1m.html'
-PLAN_9_MAN_PAGES = 'http://man.cat-v.org/plan_9/1/{}'
-POSIX7_PAGES = 'https://pubs.opengroup.org/onlinepubs/9699919799/utilities/{}.html'
-AIX_MAN_PAGES = ('http://ps-2.kev009.com/wisclibrary/aix52/usr/share/man/info/'
-                 'en_US/a_doc_lib/cmds/aixcmds{}/{}.htm')
-GNU_HTML_MANUALS = 'https://www.gnu.org/software/{}/manual/html_chapter/index.html'
+def solaris_admin_man_page_url(command_name):
+    return f'https://docs.oracle.com/cd/E23824_01/html/821-1462/{command_name}-1m.html'
+
+
+def plan_9_man_page_url(command_name):
+    return f'http://man.cat-v.org/plan_9/1/{command_name}'
+
+
+def posix_7_page_url(command_name):
+    return f'https://pubs.opengroup.org/onlinepubs/9699919799/utilities/{command_name}.html'
+
+
+def aix_man_page_url(volume, command_name):
+    return ('http://ps-2.kev009.com/wisclibrary/aix52/usr/share/man/info/'
+            f'en_US/a_doc_lib/cmds/aixcmds{volume}/{command_name}.htm')
 
-NON_OPTS_CHARS = '.,;)]}!'
+
+# Lists every command documented in an AIX volume
+def aix_volume_index_url(volume):
+    return ('http://ps-2.kev009.com/wisclibrary/aix52/usr/share/man/info/'
+            f'en_US/a_doc_lib/cmds/aixcmds{volume}/aixcmds{volume}.htm')
+
+
+def gnu_html_manual_url(command_name):
+    return f'https://www.gnu.org/software/{command_name}/manual/html_chapter/index.html'
+
+
+# AIX command documentation is split into "volumes"
+NUM_AIX_CMD_VOLUMES = 6
+AIX_VOLUME_MAN_PAGE_URLS = [
+    partial(aix_man_page_url, volume) for volume in range(1, NUM_AIX_CMD_VOLUMES+1)
+]
+
+NON_OPTS_CHARS = frozenset('.,;)]}!')
+
+# Matches the first word of a line if it looks like an option
+OPT_RE = re.compile(r'^\s*(-\S+)', re.MULTILINE)
+
+# Man pages rarely change, so fetched pages are kept on disk for a while
+CACHE_DIR = os.path.expanduser('~/.cache/avail')
+CACHE_MAX_BYTES = 5 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 60 * 60  # In seconds
+# Maps each AIX command to the volume that documents it
+AIX_INDEX_PATH = os.path.join(CACHE_DIR, 'aix_index.json')
+
+# Names of known Unix utilities, one per line, used to point out
+# commands that may be mistyped
+KNOWN_COMMANDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   'known_commands.txt')
+
+# Matches same-directory links in an AIX volume index, capturing the
+# page name and the link text
+AIX_INDEX_LINK_RE = re.compile(r'<a\s[^>]*href="([^"/#:]+)\.htm"[^>]*>(.*?)</a>',
+                               re.IGNORECASE | re.DOTALL)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Some of the pages will be unhappy if they do not appear
+# to be visited by a browser, so emulate Google Chrome on
+# Windows
+HEADERS = {
+    'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
+                   'AppleWebKit/537.36 (KHTML, like Gecko) '
+                   'Chrome/91.0.4472.106 Safari/537.36'),
+}
+
+# A single session is shared by all lookups so that connections to each
+# man page site are kept alive and reused
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+SESSION.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+SESSION.headers.update(HEADERS)
+
+# Only the tags each finder looks at are parsed into the soup. The Linux
+# strainer keeps anchors so that section headers can be found by id.
+LINUX_STRAINER = SoupStrainer(['pre', 'a'])
+AIX_STRAINER = SoupStrainer(['h3', 'span'])
 
 
 def main():
@@ -42,117 +134,257 @@ def main():
 
 
 def input_loop():
-    while True:
-        user_input = input('Enter command or ^C: ')
-
-        command = shlex.split(user_input)
-        if command == []:
-            continue
-        command_name = command[0]
-
-        user_opts = {x for x in command if x and x[0] == '-' and x != '-'}
-
-        linux_opts, description = get_linux_opts(command_name)
-        freebsd_opts = get_freebsd_opts(command_name)
-        solaris_opts = get_solaris_opts(command_name)
-        aix_opts = get_aix_opts(command_name)
-
-        if (linux_opts is None and freebsd_opts is None and
-                solaris_opts is None and aix_opts is None):
-            print(f'Failed to find result for "{command_name}".')
-            continue
-
-        # Since POSIX 7 and Plan 9 have the fewest utilities, only retrieve
-        # their options once it has been confirmed that the command is
-        # available on at least one more popular Unix platform
-        plan_9_opts = get_plan_9_opts(command_name)
-        posix_7_opts = get_posix_7_opts(command_name)
-
-        if description:
-            print()
-            print(description)
-        print()
-
-        if freebsd_opts is None:
-            print(f'{command_name} is not available on FreeBSD.')
-        if plan_9_opts is None:
-            print(f'{command_name} does not have a Plan 9 implementation.')
-        if posix_7_opts is None:
-            print(f'{command_name} is not a POSIX 7 utility.')
-        if solaris_opts is None:
-            print(f'{command_name} is not available on Solaris.')
-
-        for opt in user_opts:
-            not_present_list = []
-
-            if linux_opts and opt not in linux_opts:
-                not_present_list.append('GNU/Linux')
-            if freebsd_opts and opt not in freebsd_opts:
-                not_present_list.append('FreeBSD')
-            if plan_9_opts and opt not in plan_9_opts:
-                not_present_list.append('Plan 9')
-            if solaris_opts and opt not in solaris_opts:
-                not_present_list.append('Solaris')
-
-            print(f'{opt} not available on the following: {not_present_list}')
-
-        print()
-        if linux_opts is not None:
-            print('Linux man page:', LINUX_MAN_PAGES.format(command_name))
-            # TODO It may not be the case that all Linux man page entries
-            # have a corresponding GNU HTML manual
-            print('GNU HTML manual:', GNU_HTML_MANUALS.format(command_name))
-        if freebsd_opts is not None:
-            print('FreeBSD man page:', FREEBSD_MAN_PAGES.format(command_name))
-        if plan_9_opts is not None:
-            print('Plan 9 man page:', PLAN_9_MAN_PAGES.format(command_name))
-        if posix_7_opts is not None:
-            print('POSIX 7 reference page:', POSIX7_PAGES.format(command_name))
-        print()
-
-
-def get_soup(pages_string, command_name):
-    """Get soup for any OS based on command name.
-    Returns (soup, page_found)."""
+    # Man page lookups are dominated by waiting on the network, so the
+    # lookups for each OS are run in parallel threads
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        while True:
+            user_input = input('Enter command or ^C: ')
+
+            command = shlex.split(user_input)
+            if command == []:
+                continue
+
+            # Write the whole report at once rather than line by line
+            out = lookup(executor, command)
+            stdout.write('\n'.join(out) + '\n')
+            stdout.flush()
+
+
+def lookup(executor, command):
+    """Look up a command on each OS.
+    Returns the lines of the report to show the user."""
+
+    command_name = command[0]
+    out = []
+
+    user_opts = {x for x in command if x.startswith('-') and x != '-'}
+
+    linux_future = executor.submit(get_linux_opts, command_name)
+    freebsd_future = executor.submit(get_freebsd_opts, command_name)
+    solaris_future = executor.submit(get_solaris_opts, command_name)
+    aix_future = executor.submit(get_aix_opts, command_name)
+
+    linux_opts, description = linux_future.result()
+    freebsd_opts = freebsd_future.result()
+    solaris_opts = solaris_future.result()
+    aix_opts = aix_future.result()
+
+    if (linux_opts is None and freebsd_opts is None and
+            solaris_opts is None and aix_opts is None):
+        out.append(f'Failed to find result for "{command_name}".')
+
+        # The list of known commands is incomplete, so it is only used to
+        # hint at a typo once nothing has been found. The AIX lookup has
+        # loaded the AIX index by this point, so its commands are included.
+        known_commands = get_known_commands()
+        aix_index = get_aix_index() or {}
+        if (known_commands and command_name not in known_commands and
+                command_name not in aix_index):
+            out.append(f'"{command_name}" is not a known Unix utility, so it may be mistyped.')
+
+        return out
+
+    # Since POSIX 7 and Plan 9 have the fewest utilities, only retrieve
+    # their options once it has been confirmed that the command is
+    # available on at least one more popular Unix platform
+    plan_9_future = executor.submit(get_plan_9_opts, command_name)
+    posix_7_future = executor.submit(get_posix_7_opts, command_name)
+
+    plan_9_opts = plan_9_future.result()
+    posix_7_opts = posix_7_future.result()
+
+    if description:
+        out.append('')
+        out.append(description)
+    out.append('')
+
+    if freebsd_opts is None:
+        out.append(f'{command_name} is not available on FreeBSD.')
+    if plan_9_opts is None:
+        out.append(f'{command_name} does not have a Plan 9 implementation.')
+    if posix_7_opts is None:
+        out.append(f'{command_name} is not a POSIX 7 utility.')
+    if solaris_opts is None:
+        out.append(f'{command_name} is not available on Solaris.')
+
+    for opt in user_opts:
+        not_present_list = []
+
+        if linux_opts and opt not in linux_opts:
+            not_present_list.append('GNU/Linux')
+        if freebsd_opts and opt not in freebsd_opts:
+            not_present_list.append('FreeBSD')
+        if plan_9_opts and opt not in plan_9_opts:
+            not_present_list.append('Plan 9')
+        if solaris_opts and opt not in solaris_opts:
+            not_present_list.append('Solaris')
+
+        out.append(f'{opt} not available on the following: {not_present_list}')
+
+    out.append('')
+    if linux_opts is not None:
+        out.append(f'Linux man page: {linux_man_page_url(command_name)}')
+        # TODO It may not be the case that all Linux man page entries
+        # have a corresponding GNU HTML manual
+        out.append(f'GNU HTML manual: {gnu_html_manual_url(command_name)}')
+    if freebsd_opts is not None:
+        out.append(f'FreeBSD man page: {freebsd_man_page_url(command_name)}')
+    if plan_9_opts is not None:
+        out.append(f'Plan 9 man page: {plan_9_man_page_url(command_name)}')
+    if posix_7_opts is not None:
+        out.append(f'POSIX 7 reference page: {posix_7_page_url(command_name)}')
+    out.append('')
+
+    return out
+
+
+@lru_cache(maxsize=None)
+def get_known_commands():
+    """Get the set of known Unix utility names from known_commands.txt.
+    Returns an empty set if the list of known commands is missing."""
+
+    try:
+        with open(KNOWN_COMMANDS_PATH, encoding='utf-8') as f:
+            return frozenset(line.strip() for line in f if line.strip())
+    except OSError:
+        return frozenset()
 
-    soup = None
 
-    # TODO Implement caching up to 5MB worth of searches
-    # Right now get_cached() is just a placeholder function
-    soup, cache_hit = get_cached(command_name)
+def get_page(url_fn, command_name):
+    """Get the HTML of a man page for any OS based on command name.
+    url_fn builds the URL of the OS's man page from the command name.
+    The HTML is returned undecoded. lxml (through BeautifulSoup's
+    UnicodeDammit) detects the page's encoding itself, but Lexbor always
+    decodes it as UTF-8, which is harmless for the ASCII options it
+    extracts.
+    Returns (content, page_found)."""
+
+    url = url_fn(command_name)
+
+    content, cache_hit = get_cached(url)
     if cache_hit:
-        return soup, True
-
-    # Some of the pages will be unhappy if they do not appear
-    # to be visited by a browser, so emulate Google Chrome on
-    # Windows
-    headers = {
-        'User-Agent': ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
-                       'AppleWebKit/537.36 (KHTML, like Gecko) '
-                       'Chrome/91.0.4472.106 Safari/537.36'),
-    }
+        return content, True
 
-    res = requests.get(pages_string.format(command_name), headers=headers)
+    res = SESSION.get(url)
 
-    if res.status_code < 200 or res.status_code > 299:
-        return soup, False
+    if not res.ok:
+        return None, False
 
     # For the FreeBSD site, it will still return 200 status code even if utility
     # is not found, so we need to check if the utility was found
-    if pages_string == FREEBSD_MAN_PAGES and 'Sorry, no data found' in res.text:
-        return soup, False
+    if url_fn is freebsd_man_page_url and b'Sorry, no data found' in res.content:
+        return None, False
 
-    soup = BeautifulSoup(res.text, 'html.parser')
+    content = res.content
+    put_cached(url, content)
+
+    return content, True
+
+
+def get_soup(url_fn, command_name, parse_only=None):
+    """Get soup for any OS based on command name.
+    If parse_only is given, only the tags matched by that SoupStrainer
+    are parsed.
+    Returns (soup, page_found)."""
+
+    content, page_found = get_page(url_fn, command_name)
+    if not page_found:
+        return None, False
+
+    soup = BeautifulSoup(content, 'lxml', parse_only=parse_only)
 
     return soup, True
 
 
-def get_cached(command_name):
-    # TODO Implement caching up to 5MB worth of searches
-    # Right now get_cached() is just a placeholder function
-    soup = None
-    cache_hit = False
-    return soup, cache_hit
+def get_tree(url_fn, command_name):
+    """Get a selectolax tree for any OS based on command name.
+    This is much faster to build than soup, so it is used for pages that
+    only need tag or text lookups.
+    Returns (tree, page_found)."""
+
+    content, page_found = get_page(url_fn, command_name)
+    if not page_found:
+        return None, False
+
+    tree = LexborHTMLParser(content)
+
+    return tree, True
+
+
+def get_cache_path(url):
+    return os.path.join(CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + '.html')
+
+
+def get_cached(url):
+    """Get the cached page for a URL, if it was cached recently enough.
+    Returns (content, cache_hit)."""
+
+    path = get_cache_path(url)
+    try:
+        mtime = os.stat(path).st_mtime
+        if time.time() - mtime > CACHE_MAX_AGE:
+            return None, False
+
+        with open(path, 'rb') as f:
+            content = f.read()
+
+        # Bump the access time so that recently used pages are evicted last,
+        # but keep the modification time so the page still expires
+        os.utime(path, (time.time(), mtime))
+    except OSError:
+        return None, False
+
+    return content, True
+
+
+def put_cached(url, content):
+    """Save a page to the cache, then evict the least recently used pages
+    until the cache fits in CACHE_MAX_BYTES. Caching is best effort, so
+    failures are ignored."""
+
+    try:
+        write_cache_file(get_cache_path(url), content)
+        evict_cached()
+    except OSError:
+        pass
+
+
+def write_cache_file(path, content):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+    # Write to a temporary file first so that a file is never read
+    # while it is only partially written
+    fd, temp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except OSError:
+        os.remove(temp_path)
+        raise
+
+
+def evict_cached():
+    entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith('.html')]
+    entries.sort(key=lambda e: e.stat().st_atime, reverse=True)
+
+    total_size = 0
+    for entry in entries:
+        total_size += entry.stat().st_size
+        if total_size > CACHE_MAX_BYTES:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                # Another lookup already evicted this page
+                pass
+
+
+def extract_opts_from_text(text):
+    """Returns the options that start lines of text.
+    The first word of each line that starts with an option is taken,
+    removing false positives."""
+
+    return {o for m in OPT_RE.finditer(text) if (o := m.group(1))[-1] not in NON_OPTS_CHARS}
 
 
 def get_linux_opts(command_name):
@@ -161,68 +393,59 @@ def get_linux_opts(command_name):
     opts = None
     description = None
 
-    soup, page_found = get_soup(LINUX_MAN_PAGES, command_name)
+    soup, page_found = get_soup(linux_man_page_url, command_name, LINUX_STRAINER)
 
     if not page_found:
         return opts, description
 
-    # The description is always the second pre on the page
-    description = soup.find_all('pre')[1].text.strip()
+    # The description is always the second pre on the page, so stop
+    # searching once it has been found
+    description = soup.find_all('pre', limit=2)[1].get_text().strip()
 
     search_sections = [
         'OPTIONS',
         'EXPRESSION',  # The GNU find man page has more options under this heading
     ]
 
+    # Find the headers of all the sections in a single pass over the soup
+    header_els = soup.find_all(id=search_sections)
+
     opts = set()
-    for section in search_sections:
-        opts.update(find_opts_linux(soup, section))
+    for header_el in header_els:
+        opts.update(find_opts_linux(header_el))
 
     return opts, description
 
 
-def find_opts_linux(soup, header):
+def find_opts_linux(header_el):
     """Returns options in a section of a Linux man page.
-    The section searched is identified by the header."""
+    The section searched is identified by its header element."""
 
-    # Get the source line of the header
-    header_el = soup.find(id=header)
-    if header_el is None:
+    # Get the element where the options are described, which is the
+    # first pre following the header. lxml does not track source lines,
+    # so this relies on document order instead.
+    opts_el = header_el.find_next('pre')
+    if opts_el is None:
         return set()
-    header_source_line = soup.find(id=header).sourceline
-
-    # Get the element where the options are described
-    opts_el = [pre for pre in soup.find_all('pre') if pre.sourceline == header_source_line][0]
 
-    opts_lines = opts_el.text.split('\n')
-    opts_lines = [line.lstrip().split(maxsplit=1)[0] for line in opts_lines if line]
-    opts = [line for line in opts_lines if line[0] == '-' and line != '-']
-
-    # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
+    opts = extract_opts_from_text(opts_el.text)
 
     return opts
 
 
 def get_freebsd_opts(command_name):
-    soup, page_found = get_soup(FREEBSD_MAN_PAGES, command_name)
+    tree, page_found = get_tree(freebsd_man_page_url, command_name)
 
     if not page_found:
         return None
 
-    opts = find_opts_freebsd(soup)
+    opts = find_opts_freebsd(tree)
     return opts
 
 
-def find_opts_freebsd(soup):
-    lines = soup.text.split('\n')
-    opts_lines = [line.lstrip().split(maxsplit=1)[0] for line in lines if line.strip()]
-    opts = [line for line in opts_lines if line[0] == '-' and line != '-']
-
-    # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
-
-    return opts
+def find_opts_freebsd(tree):
+    text = '\n'.join(pre.text() for pre in tree.css('pre'))
+    return extract_opts_from_text(text)
 
 
 def get_plan_9_opts(command_name):
@@ -233,21 +456,20 @@ def get_plan_9_opts(command_name):
     if command_name in ['fcp', 'mv']:
         effective_command_name = 'cp'
 
-    soup, page_found = get_soup(PLAN_9_MAN_PAGES, effective_command_name)
+    tree, page_found = get_tree(plan_9_man_page_url, effective_command_name)
 
     if not page_found:
         return None
 
     # We must use the regular command_name (not the effective command name)
     # to parse options out from the page
-    opts = find_opts_plan_9(soup, command_name)
+    opts = find_opts_plan_9(tree, command_name)
     return opts
 
 
-def find_opts_plan_9(soup, command_name):
-    lines = soup.text.split('\n')
-    opts_lines = [line.lstrip().split(maxsplit=1)[0] for line in lines if line.strip()]
-    opts = {line for line in opts_lines if line[0] == '-' and line != '-'}
+def find_opts_plan_9(tree, command_name):
+    text = tree.text()
+    opts = extract_opts_from_text(text)
 
     # Plan 9 man pages often do not have a section dedicated to options, and
     # instead provide all the options in the SYNOPSIS, so we must parse that
@@ -255,25 +477,23 @@ def find_opts_plan_9(soup, command_name):
     # Some Plan 9 man pages document multiple commands, so we must only
     # consider the lines that start with the command_name.
 
-    # Get first line of synopsis
-    line_num = lines.index('     SYNOPSIS')+1
-    line = lines[line_num].strip()
+    # Get the lines of synopsis. A page without a synopsis has none.
+    lines = text.split('\n')
+    try:
+        synopsis_start = lines.index('     SYNOPSIS')+1
+    except ValueError:
+        synopsis_start = len(lines)
+    lines = (line.strip() for line in islice(lines, synopsis_start, None))
 
-    # Loop through each line of synopsis until first word matches command_name
-    while not line.startswith(command_name):
-        line_num += 1
-        line = lines[line_num].strip()
+    # Skip lines of synopsis until first word matches command_name
+    lines = dropwhile(lambda line: not line.startswith(command_name), lines)
 
     # Parse out options from each line where first word matches command_name
-    while line.startswith(command_name):
+    for line in takewhile(lambda line: line.startswith(command_name), lines):
         opts.update(get_plan_9_opts_from_line(line))
 
-        # Move to next line
-        line_num += 1
-        line = lines[line_num].strip()
-
     # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
+    opts = {o for o in opts if o[-1] not in NON_OPTS_CHARS}
 
     return opts
 
@@ -309,58 +529,68 @@ def get_plan_9_opts_from_line(line):
 
 
 def get_posix_7_opts(command_name):
-    soup, page_found = get_soup(POSIX7_PAGES, command_name)
+    tree, page_found = get_tree(posix_7_page_url, command_name)
 
     if not page_found:
         return None
 
-    opts = find_opts_posix_7(soup)
+    opts = find_opts_posix_7(tree)
     return opts
 
 
-def find_opts_posix_7(soup):
-    opts_candidates = soup.find_all('dt')
-    opts = [o.text for o in opts_candidates if o.text and o.text[0] == '-' and o.text != '-']
+def find_opts_posix_7(tree):
+    opts_candidates = [n.text() for n in tree.css('dt')]
 
     # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
+    opts = {
+        o for o in opts_candidates
+        if o.startswith('-') and o != '-' and o[-1] not in NON_OPTS_CHARS
+    }
 
     return opts
 
 
 def get_solaris_opts(command_name):
-    soup, page_found = get_soup(SOLARIS_USER_MAN_PAGES, command_name)
+    tree, page_found = get_tree(solaris_user_man_page_url, command_name)
 
     if not page_found:
-        soup, page_found = get_soup(SOLARIS_ADMIN_MAN_PAGES, command_name)
+        tree, page_found = get_tree(solaris_admin_man_page_url, command_name)
         if not page_found:
             return None
 
-    opts = find_opts_solaris(soup)
+    opts = find_opts_solaris(tree)
 
     return opts
 
 
-def find_opts_solaris(soup):
-    opts_candidates = soup.find_all('tt')
-    opts = [o.text for o in opts_candidates if o.text and o.text[0] == '-' and o.text != '-']
+def find_opts_solaris(tree):
+    opts_candidates = [n.text() for n in tree.css('tt')]
 
     # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
+    opts = {
+        o for o in opts_candidates
+        if o.startswith('-') and o != '-' and o[-1] not in NON_OPTS_CHARS
+    }
 
     return opts
 
 
 def get_aix_opts(command_name):
+    soup = None
     page_found = False
 
-    # Check each "volume" in AIX command documentation volumes until a match
-    # is found
-    NUM_AIX_CMD_VOLUMES = 6
-    for volume in range(1, NUM_AIX_CMD_VOLUMES+1):
-        soup, page_found = get_soup(AIX_MAN_PAGES.replace('{}', str(volume), 1), command_name)
-        if page_found:
-            break
+    # If the index knows the volume that documents the command, only that
+    # volume needs to be fetched
+    aix_index = get_aix_index()
+    volume = aix_index.get(command_name) if aix_index is not None else None
+    if volume is not None:
+        soup, page_found = get_soup(AIX_VOLUME_MAN_PAGE_URLS[volume-1], command_name,
+                                    AIX_STRAINER)
+
+    # The index is built by guessing which links in the volume index pages
+    # are commands, so check every volume before giving up
+    if not page_found:
+        soup, page_found = probe_aix_volumes(command_name)
 
     # If no match for any volume, return None
     if not page_found:
@@ -372,40 +602,130 @@ def get_aix_opts(command_name):
         'Expression Terms',
     ]
 
+    # Find the first header of each section in a single pass over the soup
+    section_headers = {}
+    for h in soup.find_all('h3'):
+        if h.text in search_sections:
+            section_headers.setdefault(h.text, h)
+
     opts = set()
-    for section in search_sections:
-        opts.update(find_opts_aix(soup, section))
+    for section_header in section_headers.values():
+        opts.update(find_opts_aix(section_header))
 
     return opts
 
 
-def find_opts_aix(soup, section):
-    h3s = soup.find_all('h3')
+def probe_aix_volumes(command_name):
+    """Get soup for an AIX command without knowing its volume.
+    Returns (soup, page_found)."""
 
-    # Get sourceline of the section with flags
-    search = [h.sourceline for h in h3s if h.text == section]
-    if not search:
-        return set()
-    flags_sourceline = search[0]
+    soup = None
+    page_found = False
 
-    header_sourcelines = sorted([h.sourceline for h in h3s])
+    # Check each "volume" in AIX command documentation volumes at once.
+    # A command is only in one volume, so use whichever match comes back
+    # first and stop waiting on the others.
+    executor = ThreadPoolExecutor(max_workers=NUM_AIX_CMD_VOLUMES)
+    futures = [
+        executor.submit(get_soup, url_fn, command_name, AIX_STRAINER)
+        for url_fn in AIX_VOLUME_MAN_PAGE_URLS
+    ]
+    try:
+        for future in as_completed(futures):
+            try:
+                soup, page_found = future.result()
+            except requests.RequestException:
+                # Another volume may still have the page, so treat a
+                # failed request as a miss
+                continue
+            if page_found:
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return soup, page_found
+
+
+@lru_cache(maxsize=None)
+def get_aix_index():
+    """Get a dict mapping AIX commands to the volume that documents them.
+    The index is built from the volume index pages, and is kept on disk
+    like other cached pages.
+    Returns None if the index could not be built."""
 
-    # Find sourceline of next header after flags section
-    for sourceline in header_sourcelines:
-        if sourceline > flags_sourceline:
-            next_header_sourceline = sourceline
-            break
+    try:
+        if time.time() - os.stat(AIX_INDEX_PATH).st_mtime <= CACHE_MAX_AGE:
+            with open(AIX_INDEX_PATH, encoding='utf-8') as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with ThreadPoolExecutor(max_workers=NUM_AIX_CMD_VOLUMES) as executor:
+        volume_commands = list(executor.map(get_aix_volume_commands,
+                                            range(1, NUM_AIX_CMD_VOLUMES+1)))
+
+    # A partial index would make commands in the missing volumes look
+    # unavailable, so fall back to checking every volume instead
+    if not all(volume_commands):
+        return None
 
-    opts_candidates = soup.find_all('span', class_='bold')
-    opts = [
-        c.text for c in opts_candidates if
-        c.sourceline > flags_sourceline and
-        c.sourceline < next_header_sourceline and
-        c.text[0] == '-' and c.text != '-'
-    ]
+    aix_index = {}
+    for volume, commands in enumerate(volume_commands, start=1):
+        for command_name in commands:
+            aix_index.setdefault(command_name, volume)
+
+    try:
+        write_cache_file(AIX_INDEX_PATH, json.dumps(aix_index).encode())
+    except OSError:
+        pass
+
+    return aix_index
+
+
+def get_aix_volume_commands(volume):
+    """Returns the names of the commands listed in an AIX volume index."""
+
+    try:
+        res = SESSION.get(aix_volume_index_url(volume))
+    except requests.RequestException:
+        # An empty volume makes the index partial, so lookups fall back
+        # to checking every volume
+        return set()
+    if not res.ok:
+        return set()
+
+    # Navigation and front matter pages are linked from the index too, so
+    # only keep links whose text starts with the name of the page they
+    # link to, such as <a href="ls.htm">ls Command</a>
+    commands = set()
+    for page_name, link_text in AIX_INDEX_LINK_RE.findall(res.text):
+        words = HTML_TAG_RE.sub('', link_text).split(maxsplit=1)
+        if (words and words[0] == page_name and
+                not page_name.startswith(f'aixcmds{volume}')):
+            commands.add(page_name)
+
+    return commands
+
+
+def find_opts_aix(section_header):
+    """Returns options in a section of an AIX man page.
+    The section searched is identified by its header element."""
+
+    # Collect the bold spans between the section header and the next
+    # header. Elements are walked lazily in document order, so nothing
+    # after the next header is visited.
+    opts_candidates = []
+    for el in section_header.next_elements:
+        if el.name == 'h3':
+            break
+        if el.name == 'span' and 'bold' in el.get('class', []):
+            opts_candidates.append(el)
 
     # Remove false positives
-    opts = {o for o in opts if not o[-1] in NON_OPTS_CHARS}
+    opts = {
+        o for c in opts_candidates
+        if (o := c.text).startswith('-') and o != '-' and o[-1] not in NON_OPTS_CHARS
+    }
 
     return opts
 